@@ -4,35 +4,219 @@ Simple A2A Client v2 - Corrected version with proper SDK usage
 """
 
 import asyncio
+import hashlib
+import os
+import queue
 import sys
+import threading
 import httpx
+import orjson
 import uuid
 import time
 from typing import Optional
-from a2a.client import ClientFactory, ClientConfig
+from a2a.client import (
+    A2AClientHTTPError,
+    A2AClientJSONError,
+    A2AClientTimeoutError,
+    ClientConfig,
+    ClientFactory,
+)
+from a2a.client.errors import A2AClientJSONRPCError
+from a2a.client.transports import JsonRpcTransport
 from a2a.types import (
     AgentCard, 
+    GetTaskRequest,
+    GetTaskResponse,
+    JSONRPCErrorResponse,
     Message, 
     TextPart, 
     Role,
     TransportProtocol,
     Task,
+    TaskQueryParams,
     TaskState,
     TaskStatusUpdateEvent,
     TaskArtifactUpdateEvent
 )
 from a2a.utils import get_message_text
+from pydantic import TypeAdapter, ValidationError
+
+
+# AgentCard validator shared by every connect() call
+_CARD_ADAPTER = TypeAdapter(AgentCard)
+
+# History requested on the first poll (and to reconcile), then on later polls
+FULL_HISTORY_LENGTH = 100
+TAIL_HISTORY_LENGTH = 5
+
+# States after which a task will not change again
+TERMINAL_STATES = (TaskState.completed, TaskState.failed, TaskState.canceled)
+
+# States in which a detached task has nothing left to report on its own
+SETTLED_STATES = TERMINAL_STATES + (TaskState.input_required,)
+
+# Consecutive refresh failures after which a detached task is dropped
+MAX_DETACHED_FAILURES = 3
 
 
 class SimpleA2AClient:
-    def __init__(self, agent_url: str):
+    def __init__(self, agent_url: str, card_url: Optional[str] = None):
         self.agent_url = agent_url
+        self.card_url = card_url  # Exact agent card URL; skips URL guessing
         self.client = None
         self.http_client = None
-        self.current_task: Optional[Task] = None
+        self._tasks: dict[str, Task] = {}  # Every task still being tracked
+        self._current_task_id: Optional[str] = None
+        self.streaming = False  # Set from the agent card's capabilities
+        # Single background worker that follows updates after each send
+        self._keep_going = False
+        self._poll_event: Optional[asyncio.Event] = None  # Set to request a round
+        self._poll_done: Optional[asyncio.Event] = None  # Set when the round ends
+        self._poll_task: Optional[asyncio.Task] = None
+        self._text_cache: dict[str, str] = {}  # message_id -> joined text
+        self._task_failures: dict[str, int] = {}  # task id -> consecutive refresh failures
+        # (task id, history_length) -> (response digest, Task)
+        self._task_cache: dict[tuple, tuple] = {}
+        # Response-stream output is written by a background thread so the
+        # send loop never waits on the terminal
+        self._log_q: queue.Queue = queue.Queue()
+        self._log_error: Optional[Exception] = None  # Set if a write fails
+        threading.Thread(target=self._log_worker, daemon=True).start()
+    
+    def _log_worker(self):
+        """Write queued output lines to stdout until a None sentinel arrives."""
+        for line in iter(self._log_q.get, None):
+            try:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+            except Exception as e:
+                # Keep the first failure for send_message to report
+                self._log_error = self._log_error or e
+            finally:
+                self._log_q.task_done()
+        self._log_q.task_done()
+    
+    def _log(self, line: str):
+        """Queue a line of output for the log thread."""
+        self._log_q.put_nowait(f"{line}\n")
+    
+    @property
+    def current_task(self) -> Optional[Task]:
+        """The task the interactive conversation is attached to."""
+        if self._current_task_id is None:
+            return None
+        return self._tasks.get(self._current_task_id)
+    
+    @current_task.setter
+    def current_task(self, task: Optional[Task]):
+        # Clearing detaches the conversation; a task that is still working
+        # stays tracked (and refreshed by polls) until it settles
+        if task is None:
+            current = self.current_task
+            if current and current.status.state in SETTLED_STATES:
+                self._untrack(current.id)
+            self._current_task_id = None
+        else:
+            self._tasks[task.id] = task
+            self._current_task_id = task.id
+    
+    def _untrack(self, task_id: str):
+        """Stop tracking a task and forget anything cached for it."""
+        self._tasks.pop(task_id, None)
+        self._task_failures.pop(task_id, None)
+        for key in [key for key in self._task_cache if key[0] == task_id]:
+            del self._task_cache[key]
+    
+    def _detached_task_ids(self) -> list[str]:
+        """Ids of tracked tasks other than the current conversation's."""
+        return [tid for tid in self._tasks if tid != self._current_task_id]
+    
+    def _settle_detached(self, results):
+        """Apply refreshed (task id, Task or exception) pairs for detached tasks.
+        
+        Detached snapshots are only used to notice when a task settles, at
+        which point it is untracked; nothing else reads them.
+        """
+        for tid, result in results:
+            if isinstance(result, BaseException):
+                failures = self._task_failures.get(tid, 0) + 1
+                if failures == 1:
+                    print(f"   Background task {tid} refresh failed: {result}")
+                # JSON-RPC errors (e.g. task not found) will not clear up
+                if isinstance(result, A2AClientJSONRPCError) or failures >= MAX_DETACHED_FAILURES:
+                    print(f"   Dropping background task {tid}")
+                    self._untrack(tid)
+                else:
+                    self._task_failures[tid] = failures
+                continue
+            
+            self._task_failures.pop(tid, None)
+            if result.status.state in SETTLED_STATES:
+                self._untrack(tid)
+            else:
+                self._tasks[tid] = result
+    
+    async def _refresh_detached(self):
+        """Refresh detached tasks once, for update paths that do not poll."""
+        others = self._detached_task_ids()
+        if others:
+            results = await self._get_tasks([TaskQueryParams(id=tid, history_length=0) for tid in others])
+            self._settle_detached(zip(others, results))
+    
+    async def _get_task(self, params: TaskQueryParams) -> Task:
+        """Run tasks/get, reusing the parsed Task when the response is unchanged."""
+        # This posts tasks/get directly on the transport's URL so the raw
+        # body can be hashed before parsing. That bypasses the SDK's
+        # interceptors and extension headers, so only take this path for a
+        # plain JSON-RPC transport that has neither configured.
+        transport = getattr(self.client, '_transport', None)
+        if (not isinstance(transport, JsonRpcTransport)
+                or transport.interceptors
+                or transport.extensions):
+            return await self.client.get_task(params)
+        
+        # A fixed request id keeps identical snapshots byte-identical
+        payload = GetTaskRequest(id=params.id, params=params).model_dump(mode='json', exclude_none=True)
+        try:
+            response = await self.http_client.post(transport.url, json=payload)
+            response.raise_for_status()
+        except httpx.TimeoutException as e:
+            raise A2AClientTimeoutError('Client Request timed out') from e
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(503, f'Network communication error: {e}') from e
+        
+        # Responses differ by requested history window, so key on both
+        key = (params.id, params.history_length)
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        cached = self._task_cache.get(key)
+        if cached and cached[0] == digest:
+            return cached[1]
+        
+        try:
+            result = GetTaskResponse.model_validate_json(response.content).root
+        except ValidationError as e:
+            raise A2AClientJSONError(str(e)) from e
+        if isinstance(result, JSONRPCErrorResponse):
+            raise A2AClientJSONRPCError(result)
+        self._task_cache[key] = (digest, result.result)
+        return result.result
+    
+    async def _get_tasks(self, queries: list) -> list:
+        """Fetch several tasks concurrently; failures are returned in place."""
+        return await asyncio.gather(
+            *(self._get_task(q) for q in queries),
+            return_exceptions=True
+        )
         
     def _get_agent_card_urls(self, agent_url: str) -> list[str]:
         """Get possible agent card URLs."""
+        # An explicit card URL (flag or A2A_AGENT_CARD_URL) is the only candidate
+        override = self.card_url or os.environ.get("A2A_AGENT_CARD_URL")
+        if override:
+            return [override]
+        
         urls = []
         
         # Standard .well-known path
@@ -48,28 +232,55 @@ class SimpleA2AClient:
         
         return urls
     
+    def _text(self, msg: Message) -> str:
+        """Return the text content of a message, memoized by message_id."""
+        key = msg.message_id
+        text = self._text_cache.get(key)
+        if text is None:
+            text = get_message_text(msg) or ""
+            self._text_cache[key] = text
+        return text
+    
     async def connect(self):
         """Connect to the A2A server."""
         print(f"🔌 Connecting to: {self.agent_url}")
         
         try:
-            # Create HTTP client with longer timeout
-            self.http_client = httpx.AsyncClient(timeout=60.0)
+            # Create HTTP/2 client with longer timeout and a persistent
+            # keep-alive pool shared by discovery, sends and polls
+            self.http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=50,
+                    keepalive_expiry=60.0
+                )
+            )
             
-            # Try different agent card URL patterns
+            # Try all agent card URL patterns concurrently; first 200 wins
             agent_card_data = None
             card_urls = self._get_agent_card_urls(self.agent_url)
             
             for url in card_urls:
-                try:
-                    print(f"   Trying: {url}")
-                    response = await self.http_client.get(url)
-                    if response.status_code == 200:
-                        agent_card_data = response.json()
-                        print(f"   ✅ Found agent card at: {url}")
-                        break
-                except Exception as e:
-                    continue
+                print(f"   Trying: {url}")
+            tasks = [asyncio.create_task(self.http_client.get(url)) for url in card_urls]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    try:
+                        response = await next_done
+                        if response.status_code != 200:
+                            continue
+                        agent_card_data = orjson.loads(response.content)
+                    except Exception:
+                        continue
+                    print(f"   ✅ Found agent card at: {response.request.url}")
+                    break
+            finally:
+                # Cancel the losers and let them settle
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
             
             if not agent_card_data:
                 print("❌ Could not fetch agent card from any URL pattern")
@@ -80,17 +291,21 @@ class SimpleA2AClient:
             if 'version' not in agent_card_data:
                 agent_card_data['version'] = '1.0.0'
             
-            agent_card = AgentCard.model_validate(agent_card_data)
+            agent_card = _CARD_ADAPTER.validate_python(agent_card_data)
             print(f"✅ Connected to: {agent_card.name}")
             print(f"   Protocol: v{agent_card.protocol_version}")
             print(f"   Transport: {agent_card.preferred_transport}")
             
+            # Follow updates over the server's stream when it advertises one;
+            # otherwise fall back to manual polling
+            self.streaming = bool(agent_card.capabilities and agent_card.capabilities.streaming)
+            print(f"   Updates: {'streaming' if self.streaming else 'polling'}")
+            
             # Create client using ClientFactory with correct configuration
-            # Note: Streaming seems to have issues with multiple messages, so keeping it disabled
             config = ClientConfig(
                 httpx_client=self.http_client,
-                streaming=False,  # Disabled - causes issues with multiple responses
-                polling=True,  # Enable polling to receive responses!
+                streaming=self.streaming,
+                polling=not self.streaming,
                 supported_transports=[TransportProtocol.jsonrpc],
                 use_client_preference=False,
                 accepted_output_modes=["text/plain", "application/json"]
@@ -99,6 +314,12 @@ class SimpleA2AClient:
             factory = ClientFactory(config)
             self.client = factory.create(agent_card)
             
+            # Start the update worker; it idles until send_message wakes it
+            self._keep_going = True
+            self._poll_event = asyncio.Event()
+            self._poll_done = asyncio.Event()
+            self._poll_task = asyncio.create_task(self._poll_worker())
+            
             print("✅ Client initialized successfully\n")
             return True
             
@@ -108,101 +329,237 @@ class SimpleA2AClient:
                 await self.http_client.aclose()
             return False
     
-    async def poll_for_updates(self, max_polls: int = 10, interval: float = 2.0):
-        """Manually poll for task updates and messages."""
+    def _finish_updates(self, task: Task, last_agent_message: Optional[Message]) -> bool:
+        """Report the outcome and return True once the task needs no more watching."""
+        # Stop on input_required (agent is waiting for user input)
+        if task.status.state == TaskState.input_required:
+            if last_agent_message:
+                print(f"\n   ✅ Agent responded. Stopping updates.\n")
+                # Display the agent's message using the SDK's helper function
+                print("🤖 Agent:")
+                message_text = self._text(last_agent_message)
+                if message_text:
+                    print(f"{message_text}")
+                else:
+                    print("[No text content in agent message]")
+            else:
+                print(f"\n   ℹ️ Reached input_required state. Stopping updates.")
+                print(f"   (No agent message found in status)")
+            self.current_task = task
+            return True
+        
+        # Also stop on terminal states
+        if task.status.state in TERMINAL_STATES:
+            print(f"\n   Task {task.status.state}. Stopping updates.")
+            
+            # Display the agent's final message if available
+            if task.status.state == TaskState.completed and last_agent_message:
+                print("\n🤖 Agent (final message):")
+                message_text = self._text(last_agent_message)
+                if message_text:
+                    print(f"{message_text}")
+                else:
+                    print("[No text content in agent message]")
+            
+            self.current_task = task
+            return True
+        
+        return False
+    
+    def _latest_agent_message(self, task: Task) -> Optional[Message]:
+        """Return the newest agent message carried by a task snapshot."""
+        msg = task.status.message
+        if msg and msg.role == Role.agent:
+            return msg
+        for item in reversed(task.history or []):
+            if item.role == Role.agent:
+                return item
+        return None
+    
+    async def stream_updates(self):
+        """Follow task updates over the server's stream, falling back to polling."""
         if not self.current_task:
             return
-            
-        from a2a.types import TaskQueryParams
         
+        from a2a.types import TaskIdParams
+        
+        # Streaming never polls, so give detached tasks their refresh here
+        await self._refresh_detached()
+        
+        # The send stream usually leaves the task settled already; only
+        # subscribe when there is still something to wait for
+        known = self.current_task
+        if self._finish_updates(known, self._latest_agent_message(known)):
+            return
+        
+        # Stream-built tasks only carry this stream's status messages, so
+        # keep the history we already have and append anything new
+        known_history = known.history or []
+        known_ids = {item.message_id for item in known_history}
+        
+        params = TaskIdParams(id=known.id)
+        last_state = known.status.state
+        try:
+            print(f"   Subscribing to task {params.id}...")
+            async for task, _event in self.client.resubscribe(params):
+                if known_history:
+                    extra = [item for item in task.history or [] if item.message_id not in known_ids]
+                    task = task.model_copy(update={'history': known_history + extra})
+                if task.status.state != last_state:
+                    print(f"   ✓ State changed: {last_state} → {task.status.state}")
+                    last_state = task.status.state
+                if self._finish_updates(task, self._latest_agent_message(task)):
+                    return
+            print("   Stream closed before the agent responded.")
+        except Exception as e:
+            print(f"   Stream error: {e}")
+        
+        print("   🔄 Falling back to polling...")
+        await self.poll_for_updates()
+    
+    async def poll_for_updates(
+        self,
+        *,
+        initial_wait: float = 0.25,
+        max_wait: float = 10.0,
+        backoff: float = 1.5,
+        max_attempts: int = 40,
+        idle_after: float = 30.0,
+        idle_wait: float = 60.0,
+        timeout: float = 300.0,
+    ):
+        """Manually poll for task updates and messages.
+
+        The delay between polls starts at ``initial_wait`` and grows by
+        ``backoff`` up to ``max_wait``; it resets whenever the task state
+        changes or a new message arrives. Once ``idle_after`` seconds pass
+        with no change, the delay jumps to ``idle_wait`` until something
+        happens. Polling gives up after ``max_attempts`` polls or
+        ``timeout`` seconds, whichever comes first.
+        """
+        if not self.current_task:
+            return
+            
         poll_count = 0
         last_state = None
-        messages_received = []
+        messages_received: set[str] = set()
+        last_history_id = None  # Newest history entry seen on a prior poll
         last_agent_message = None  # Store the agent message persistently
+        wait = initial_wait
+        started = last_change = time.monotonic()
         
-        while poll_count < max_polls:
+        while poll_count < max_attempts:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                print(f"\n   No update after {timeout:.0f}s. Stopping.")
+                break
+            wait = min(wait, remaining)
             poll_count += 1
-            print(f"\n   Poll #{poll_count} (waiting {interval}s)...")
-            await asyncio.sleep(interval)
+            print(f"\n   Poll #{poll_count} (waiting {wait:.2f}s)...")
+            await asyncio.sleep(wait)
+            wait = min(max_wait, wait * backoff)
             
             try:
-                # Create query params for the task
+                # Fetch the full history once, then only a short tail
+                history_length = FULL_HISTORY_LENGTH if last_history_id is None else TAIL_HISTORY_LENGTH
                 params = TaskQueryParams(
                     id=self.current_task.id,
-                    history_length=100  # Get full history
+                    history_length=history_length
                 )
                 
-                # Get task update
+                # Get task update, refreshing any background tasks alongside
                 print(f"   Checking task {self.current_task.id}...")
-                task = await self.client.get_task(params)
+                others = self._detached_task_ids()
+                task, *background = await self._get_tasks(
+                    [params] + [TaskQueryParams(id=tid, history_length=0) for tid in others]
+                )
+                self._settle_detached(zip(others, background))
+                if isinstance(task, BaseException):
+                    raise task
+                
+                # If the tail no longer reaches the last entry we saw, more
+                # arrived than it holds; reconcile against the full history
+                if (last_history_id is not None
+                        and task.history
+                        and len(task.history) >= history_length
+                        and all(item.message_id != last_history_id for item in task.history)):
+                    print("   Tail missed history entries; refetching full history...")
+                    task = await self._get_task(TaskQueryParams(
+                        id=self.current_task.id,
+                        history_length=FULL_HISTORY_LENGTH
+                    ))
+                changed = False
                 
                 # Check for state change
-                current_state = task.status.state if hasattr(task.status, 'state') else str(task.status)
+                state = getattr(task.status, 'state', None)
+                current_state = state if state is not None else str(task.status)
                 if current_state != last_state:
                     print(f"   ✓ State changed: {last_state} → {current_state}")
                     last_state = current_state
+                    changed = True
                 else:
                     print(f"   State: {current_state}")
                 
                 # Check for message in task.status.message
-                if hasattr(task.status, 'message') and task.status.message:
-                    msg = task.status.message
-                    
+                msg = getattr(task.status, 'message', None)
+                if msg:
                     # Check if this is a new agent message we haven't seen
-                    msg_id = msg.message_id if hasattr(msg, 'message_id') else str(id(msg))
+                    msg_id = getattr(msg, 'message_id', None) or str(id(msg))
                     if msg_id not in messages_received:
-                        messages_received.append(msg_id)
+                        messages_received.add(msg_id)
+                        changed = True
                         if msg.role == Role.agent:
                             last_agent_message = msg  # Store the agent message
                 
                 # Also check for messages in history
                 if task.history:
-                    for item in task.history:
+                    # Only walk the tail added since the last poll
+                    new_items = []
+                    for item in reversed(task.history):
+                        if item.message_id == last_history_id:
+                            break
+                        new_items.append(item)
+                    last_history_id = task.history[-1].message_id
+                    
+                    for item in reversed(new_items):
                         if isinstance(item, Message) and item.message_id not in messages_received:
-                            messages_received.append(item.message_id)
+                            messages_received.add(item.message_id)
+                            changed = True
                             if item.role == Role.agent:
                                 last_agent_message = item  # Store the agent message
                 
                 # Check if we should stop polling
-                if hasattr(task.status, 'state'):
-                    # Stop on input_required (agent is waiting for user input)
-                    if task.status.state == TaskState.input_required:
-                        if last_agent_message:
-                            print(f"\n   ✅ Agent responded. Stopping polls.\n")
-                            # Display the agent's message using the SDK's helper function
-                            print("🤖 Agent:")
-                            message_text = get_message_text(last_agent_message)
-                            if message_text:
-                                print(f"{message_text}")
-                            else:
-                                print("[No text content in agent message]")
-                        else:
-                            print(f"\n   ℹ️ Reached input_required state. Stopping polls.")
-                            print(f"   (No agent message found in status)")
-                        self.current_task = task
-                        break
-                    
-                    # Also stop on terminal states
-                    if task.status.state in [TaskState.completed, TaskState.failed, TaskState.canceled]:
-                        print(f"\n   Task {task.status.state}. Stopping polls.")
-                        
-                        # Display the agent's final message if available
-                        if task.status.state == TaskState.completed and last_agent_message:
-                            print("\n🤖 Agent (final message):")
-                            message_text = get_message_text(last_agent_message)
-                            if message_text:
-                                print(f"{message_text}")
-                            else:
-                                print("[No text content in agent message]")
-                        
-                        self.current_task = task
-                        break
+                if state is not None and self._finish_updates(task, last_agent_message):
+                    break
+                
+                # Poll fast after activity; drop to idle pace when nothing moves
+                if changed:
+                    last_change = time.monotonic()
+                    wait = initial_wait
+                elif time.monotonic() - last_change >= idle_after:
+                    wait = idle_wait
                         
             except Exception as e:
                 print(f"   Poll error: {e}")
-                
-        if poll_count >= max_polls:
-            print(f"\n   Reached max polls ({max_polls}). Stopping.")
+        else:
+            print(f"\n   Reached max polls ({max_attempts}). Stopping.")
+    
+    async def _poll_worker(self):
+        """Follow task updates each time send_message signals, for the client's lifetime."""
+        while self._keep_going:
+            await self._poll_event.wait()
+            try:
+                if self.streaming:
+                    print("\n   📡 Streaming updates...")
+                    await self.stream_updates()
+                else:
+                    print("\n   🔄 Starting manual polling for updates...")
+                    await self.poll_for_updates()
+            except Exception as e:
+                print(f"   Update error: {e}")
+            finally:
+                self._poll_event.clear()
+                self._poll_done.set()
     
     async def send_message(self, text: str):
         """Send a message to the agent."""
@@ -230,61 +587,68 @@ class SimpleA2AClient:
             print("   Waiting for responses...")
             print(f"   [Polling enabled: {self.client._config.polling}]")
             
-            async for response in self.client.send_message(message):
-                if isinstance(response, tuple):
-                    # Task update
-                    task, event = response
-                    self.current_task = task
-                    print(f"\n   📋 Task Update #{response_count + 1}:")
-                    print(f"      Task ID: {task.id}")
-                    print(f"      Context ID: {task.context_id if task.context_id else 'None'}")
-                    if hasattr(task.status, 'state'):
-                        print(f"      State: {task.status.state}")
-                    if hasattr(task.status, 'message'):
+            try:
+                async for response in self.client.send_message(message):
+                    if isinstance(response, tuple):
+                        # Task update
+                        task, event = response
+                        self.current_task = task
+                        self._log(f"\n   📋 Task Update #{response_count + 1}:")
+                        self._log(f"      Task ID: {task.id}")
+                        self._log(f"      Context ID: {task.context_id if task.context_id else 'None'}")
+                        state = getattr(task.status, 'state', None)
+                        if state is not None:
+                            self._log(f"      State: {state}")
                         # Status message is actually a Message object
-                        msg = task.status.message
-                        if hasattr(msg, 'parts'):
-                            for part in msg.parts:
-                                if hasattr(part, 'text'):
-                                    print(f"      Last message: {part.text[:100]}...")
-                    else:
-                        print(f"      Status: {task.status}")
-                    if task.metadata:
-                        print(f"      Metadata: {task.metadata}")
-                    if event:
-                        print(f"      Event: {type(event).__name__}")
-                    response_count += 1
+                        msg = getattr(task.status, 'message', None)
+                        if msg is not None and getattr(msg, 'parts', None) is not None:
+                            message_text = self._text(msg)
+                            if message_text:
+                                self._log(f"      Last message: {message_text[:100]}...")
+                        if task.metadata:
+                            self._log(f"      Metadata: {task.metadata}")
+                        if event:
+                            self._log(f"      Event: {type(event).__name__}")
+                        response_count += 1
                     
-                elif isinstance(response, Message):
-                    # Message response
-                    message_count += 1
-                    print(f"\n📨 Received message #{message_count} (role: {response.role})")
+                    elif isinstance(response, Message):
+                        # Message response
+                        message_count += 1
+                        self._log(f"\n📨 Received message #{message_count} (role: {response.role})")
                     
-                    if response.role == Role.agent:
-                        print("🤖 Agent says:")
-                        for part in response.parts:
-                            if hasattr(part, 'text'):
-                                print(f"   {part.text}")
-                    elif response.role == Role.user:
-                        print("👤 User echo:")
-                        for part in response.parts:
-                            if hasattr(part, 'text'):
-                                print(f"   {part.text}")
+                        if response.role == Role.agent:
+                            self._log("🤖 Agent says:")
+                            message_text = self._text(response)
+                            if message_text:
+                                self._log(f"   {message_text}")
+                        elif response.role == Role.user:
+                            self._log("👤 User echo:")
+                            message_text = self._text(response)
+                            if message_text:
+                                self._log(f"   {message_text}")
                     
-                    response_count += 1
-                else:
-                    print(f"   Unknown response type: {type(response)}")
-                    response_count += 1
+                        response_count += 1
+                    else:
+                        self._log(f"   Unknown response type: {type(response)}")
+                        response_count += 1
+            finally:
+                # Let queued output reach the terminal before printing again
+                await asyncio.to_thread(self._log_q.join)
+            if self._log_error:
+                error, self._log_error = self._log_error, None
+                raise error
             
             if response_count == 0:
                 print("   ⚠️ No responses received")
             else:
                 print(f"   Total responses: {response_count} (messages: {message_count})")
             
-            # If we only got a task update and no messages, start manual polling
+            # If we only got a task update and no messages, wake the worker
+            # and wait for it to finish this round of updates
             if self.current_task and message_count == 0:
-                print("\n   🔄 Starting manual polling for updates...")
-                await self.poll_for_updates()
+                self._poll_done.clear()
+                self._poll_event.set()
+                await self._poll_done.wait()
             
             print()
             
@@ -299,6 +663,11 @@ class SimpleA2AClient:
             print("❌ No active conversation to end")
             return
         
+        # Stop tracking the task whether or not the server accepts the update
+        task_id = self.current_task.id
+        self._untrack(task_id)
+        self._current_task_id = None
+        
         try:
             from a2a.types import TaskStatusUpdateEvent, TaskStatus
             
@@ -306,7 +675,7 @@ class SimpleA2AClient:
             
             # Create a status update event to mark task as completed
             status_update = TaskStatusUpdateEvent(
-                task_id=self.current_task.id,
+                task_id=task_id,
                 status=TaskStatus(state=TaskState.completed)
             )
             
@@ -314,13 +683,11 @@ class SimpleA2AClient:
             await self.client.send_task_status_update(status_update)
             
             print("✅ Conversation ended")
-            self.current_task = None
             
         except Exception as e:
             print(f"❌ Error ending conversation: {e}")
             # If the SDK method doesn't exist or fails, just clear locally
             print("   Clearing conversation locally")
-            self.current_task = None
     
     async def run_interactive(self):
         """Run interactive chat loop."""
@@ -336,7 +703,7 @@ class SimpleA2AClient:
         
         while True:
             try:
-                user_input = input("You> ").strip()
+                user_input = (await asyncio.to_thread(input, "You> ")).strip()
                 
                 if not user_input:
                     continue
@@ -359,24 +726,40 @@ class SimpleA2AClient:
     
     async def disconnect(self):
         """Clean up connections."""
+        self._log_q.put_nowait(None)
+        self._keep_going = False
+        if self._poll_task:
+            self._poll_task.cancel()
+            await asyncio.gather(self._poll_task, return_exceptions=True)
+            self._poll_task = None
         if self.http_client:
             await self.http_client.aclose()
 
 
 async def main():
     # Parse arguments
-    if len(sys.argv) > 1:
-        url = sys.argv[1]
+    args = sys.argv[1:]
+    card_url = None
+    if '--card-url' in args:
+        idx = args.index('--card-url')
+        if idx + 1 >= len(args):
+            print("Usage: python a2a_client.py [<a2a-server-url> | --banterop] [--card-url <agent-card-url>]")
+            return
+        card_url = args[idx + 1]
+        del args[idx:idx + 2]
+    
+    if args:
+        url = args[0]
     else:
         # Default to localhost
         url = "http://localhost:3003/api/rooms/please-replace-this-placeholder-1756426027739-gvr0wy/a2a"
     
     # Override for banterop test
-    if len(sys.argv) > 1 and sys.argv[1] == '--banterop':
+    if args and args[0] == '--banterop':
         url = "https://banterop.fhir.me/api/bridge/eyJ0aXRsZSI6IlJ1bjogS25lZSBNUkkgUHJpb3IgQXV0aCIsInNjZW5hcmlvSWQiOiJzY2VuX2tuZWVfbXJpXzAxIiwiYWdlbnRzIjpbeyJpZCI6InBhdGllbnQtYWdlbnQifSx7ImlkIjoiaW5zdXJhbmNlLWF1dGgtc3BlY2lhbGlzdCIsImNvbmZpZyI6eyJtb2RlbCI6Im9wZW5haS9ncHQtb3NzLTEyMGI6bml0cm8ifX1dLCJzdGFydGluZ0FnZW50SWQiOiJwYXRpZW50LWFnZW50In0/a2a"
     
     # Create client
-    client = SimpleA2AClient(url)
+    client = SimpleA2AClient(url, card_url=card_url)
     
     # Connect
     if not await client.connect():
@@ -391,4 +774,10 @@ async def main():
 
 if __name__ == "__main__":
     print("Starting A2A Client v2...")
-    asyncio.run(main())
\ No newline at end of file
+    # Use the libuv-backed event loop when available (not on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
@@ -40,7 +40,7 @@ source .venv/bin/activate
 # Install dependencies
 echo ""
 echo "Installing dependencies..."
-uv pip install a2a-sdk httpx
+uv pip install a2a-sdk "httpx[http2]" orjson
 
 echo ""
 echo "==============================================="
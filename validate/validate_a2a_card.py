@@ -7,10 +7,29 @@ Example: python validate_a2a_card.py http://localhost:3003/rooms/abc/agent-card.
 """
 
 import sys
-import json
-import requests
+import httpx
+import orjson
 from a2a.types import AgentCard
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
+
+
+# Shared client so repeated validations reuse pooled connections
+_CLIENT = httpx.Client(
+    http2=True,
+    timeout=10.0,
+    follow_redirects=True,  # requests.get followed redirects; keep that behavior
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+)
+
+# Built once so repeated validations reuse the compiled validator
+_CARD_ADAPTER = TypeAdapter(AgentCard)
+
+
+def _write_json(data):
+    """Pretty-print JSON to stdout as bytes, without building a str copy."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+    sys.stdout.buffer.flush()
 
 
 def validate_agent_card_from_url(url: str):
@@ -22,17 +41,18 @@ def validate_agent_card_from_url(url: str):
     
     try:
         # Fetch the agent card
-        response = requests.get(url, timeout=10)
+        response = _CLIENT.get(url)
         response.raise_for_status()
-        agent_card_data = response.json()
+        raw = response.content
+        agent_card_data = orjson.loads(raw)
         
         print("✓ Successfully fetched agent card")
         print(f"  Response status: {response.status_code}")
-        print(f"  Content size: {len(response.text)} bytes\n")
+        print(f"  Content size: {len(raw)} bytes\n")
         
         # Validate using the A2A SDK
         try:
-            agent_card = AgentCard.model_validate(agent_card_data)
+            agent_card = _CARD_ADAPTER.validate_python(agent_card_data)
             
             print("✅ VALIDATION PASSED\n")
             print("Agent Card Details (validated by a2a-sdk):")
@@ -59,27 +79,30 @@ def validate_agent_card_from_url(url: str):
                 print(f"  State Transition History: {agent_card.capabilities.state_transition_history}")
                 
                 if agent_card.capabilities.extensions:
-                    print(f"\nExtensions ({len(agent_card.capabilities.extensions)}):")
+                    lines: list[str] = [f"\nExtensions ({len(agent_card.capabilities.extensions)}):"]
                     for ext in agent_card.capabilities.extensions:
-                        print(f"  - URI: {ext.uri}")
-                        print(f"    Description: {ext.description[:60]}...")
-                        print(f"    Required: {ext.required}")
+                        lines.append(f"  - URI: {ext.uri}")
+                        lines.append(f"    Description: {ext.description[:60]}...")
+                        lines.append(f"    Required: {ext.required}")
+                    sys.stdout.write("\n".join(lines) + "\n")
             
             # Skills
             if agent_card.skills:
-                print(f"\nSkills ({len(agent_card.skills)}):")
+                lines = [f"\nSkills ({len(agent_card.skills)}):"]
                 for skill in agent_card.skills:
-                    print(f"  - {skill.name} (id: {skill.id})")
-                    print(f"    Description: {skill.description[:60]}...")
+                    lines.append(f"  - {skill.name} (id: {skill.id})")
+                    lines.append(f"    Description: {skill.description[:60]}...")
                     if skill.tags:
-                        print(f"    Tags: {', '.join(skill.tags)}")
+                        lines.append(f"    Tags: {', '.join(skill.tags)}")
+                sys.stdout.write("\n".join(lines) + "\n")
             
             # Additional interfaces
             if agent_card.additional_interfaces:
-                print(f"\nAdditional Interfaces ({len(agent_card.additional_interfaces)}):")
+                lines = [f"\nAdditional Interfaces ({len(agent_card.additional_interfaces)}):"]
                 for interface in agent_card.additional_interfaces:
-                    print(f"  - URL: {interface.url}")
-                    print(f"    Transport: {interface.transport}")
+                    lines.append(f"  - URL: {interface.url}")
+                    lines.append(f"    Transport: {interface.transport}")
+                sys.stdout.write("\n".join(lines) + "\n")
             
             # Input/Output modes
             if agent_card.default_input_modes:
@@ -90,7 +113,7 @@ def validate_agent_card_from_url(url: str):
             print("\n" + "=" * 60)
             print("Full Validated Model (as JSON):")
             print("=" * 60)
-            print(json.dumps(agent_card.model_dump(mode='json', exclude_none=True), indent=2))
+            _write_json(agent_card.model_dump(mode='json', exclude_none=True))
             
         except ValidationError as e:
             print("❌ VALIDATION FAILED\n")
@@ -108,22 +131,26 @@ def validate_agent_card_from_url(url: str):
             print("\n" + "=" * 60)
             print("Raw JSON received:")
             print("=" * 60)
-            print(json.dumps(agent_card_data, indent=2))
+            # Show the bytes exactly as served; re-encoding the parsed dict
+            # could alter values (orjson reads >64-bit integers as floats)
+            sys.stdout.flush()
+            sys.stdout.buffer.write(raw if raw.endswith(b"\n") else raw + b"\n")
+            sys.stdout.buffer.flush()
             sys.exit(1)
             
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print(f"❌ ERROR: Request timed out after 10 seconds")
         sys.exit(1)
-    except requests.exceptions.ConnectionError as e:
+    except httpx.ConnectError as e:
         print(f"❌ ERROR: Failed to connect to {url}")
         print(f"   Details: {e}")
         sys.exit(1)
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         print(f"❌ ERROR: HTTP error occurred")
         print(f"   Status code: {e.response.status_code}")
         print(f"   Response: {e.response.text}")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"❌ ERROR: Invalid JSON response")
         print(f"   Details: {e}")
         sys.exit(1)